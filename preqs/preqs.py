@@ -19,15 +19,18 @@
 # pylint: disable=import-error
 
 import argparse
-import ast
+import functools
 import os
 import hashlib
 import logging
+import mmap
+import re
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime as dt
 from enum import Enum
-from glob import glob
 from importlib import metadata
 # locals
 try:
@@ -121,68 +124,80 @@ class ArgParser:
 class CodeParser:
     """The internal Python module code parser.
 
-    This code parser uses `ast` to parse a Python module and extract any
-    import statements, whose module name is returned to the caller.
+    This code parser uses a compiled regular expression to scan a Python
+    module and extract any import statements, whose module name is
+    returned to the caller.
 
     Note:
         ``classmethod`` decorators are used here so the class can be
         used within the need for instantiation.
 
+    Note:
+        A full ``ast`` parse is not required as the grammar for an import
+        statement is trivial. Comments and string literals are matched
+        (and skipped) by the same expression, so import statements
+        appearing in docstring examples are not reported.
+
     """
 
+    # Non-ASCII identifier bytes (UTF-8) are matched explicitly, as bytes-mode \w is ASCII-only.
+    # A backslash line continuation is matched as whitespace within a statement.
+    _RE_IMPORTS = re.compile(rb"""
+        \#[^\n]*
+        |'{3}(?:\\.|.)*?'{3}|"{3}(?:\\.|.)*?"{3}
+        |'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"
+        |(?:^|[;:])[ \t]*(?:import(?:[ \t]|\\\r?\n)+(?P<names>(?:[\w\x80-\xff., \t]|\\\r?\n)+)
+                          |from(?:[ \t]|\\\r?\n)+(?P<level>\.*)(?P<module>[\w\x80-\xff][\w\x80-\xff.]*)
+                           (?:[ \t]|\\\r?\n)+import\b)
+        """, re.MULTILINE | re.DOTALL | re.VERBOSE)
+    _RE_CONTINUATION = re.compile(rb'\\\r?\n')
+
     @classmethod
     def extract_imports(cls, path: str) -> set:
         """Extract imported modules from the provided Python module.
 
-        Args:
-            path (str): Path to the Python module to be analysed.
-
-        Returns:
-            set: A set containing the imported modules.
-
-        """
-        nodes = cls._ast_parse(path=path)
-        imports = cls._read_nodes(nodes=nodes)
-        return imports
-
-    @classmethod
-    def _ast_parse(cls, path: str) -> filter:
-        """Parse the Python module using ``ast``.
+        The module is memory-mapped and scanned as bytes, so the file is
+        neither copied into memory nor decoded.
 
         Args:
             path (str): Path to the Python module to be analysed.
 
         Returns:
-            filter: A filter object containing the ``ast`` nodes matching
-            an instance of ``ast.Import`` or ``ast.ImportFrom``.
+            set: A set containing the imported top-level modules.
 
         """
-        with open(path, 'r', encoding='utf-8') as f:
-            code = f.read()
-        nodes = filter(lambda x: isinstance(x, (ast.Import, ast.ImportFrom)),
-                       ast.walk(ast.parse(code)))
-        return nodes
+        with open(path, 'rb') as f:
+            # An empty file cannot be memory-mapped.
+            if not os.fstat(f.fileno()).st_size:
+                return set()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as code:
+                imports = cls._scan(code=code)
+        return imports
 
     @classmethod
-    def _read_nodes(cls, nodes: filter) -> set:
-        """Extract the module name from the provided nodes.
+    def _scan(cls, code: mmap.mmap) -> set:
+        """Extract the module names from the provided source code.
 
         Args:
-            nodes (filter): The ``nodes`` object is expected to be
-                provided using the :meth:`_ast_parse` method of this
-                class.
+            code (mmap.mmap): The memory-mapped source code, as provided
+                by the :meth:`extract_imports` method of this class.
 
         Returns:
-            set: A set containing the module names imported in the parsed
-            Python module.
+            set: A set containing the top-level module names imported in
+            the parsed Python module (i.e. 'spam' rather than
+            'spam.eggs'). Relative imports are excluded.
 
         """
         imports = set()
-        for node in nodes:
-            if isinstance(node, ast.Import):
-                imports.update((n.name for n in node.names))
-            if isinstance(node, ast.ImportFrom) and not node.level:
-                imports.add(node.module)
+        for m in cls._RE_IMPORTS.finditer(code):
+            if m['names']:
+                # import spam, eggs.ham as ham
+                names = cls._RE_CONTINUATION.sub(b' ', m['names'])
+                imports.update(n.split()[0].partition(b'.')[0].decode(errors='replace')
+                               for n in names.split(b',')
+                               if n.strip())
+            elif m['module'] and not m['level']:
+                imports.add(m['module'].partition(b'.')[0].decode(errors='replace'))
         return imports
 
 
@@ -211,16 +226,19 @@ class Requirements:
 
     """
 
-    _FILE_EXTS = ['*.py', '*.pyw']
-    _IGNORE_DIRS = list(map(os.path.realpath, [
-                                               '.ipynb_checkpoints',
-                                               '.git',
-                                               '.svn',
-                                               '.tox',
-                                               'test',
-                                               'tests',
-                                               '__pycache__',
-                                              ]))
+    _BUILTINS = sys.stdlib_module_names
+    _FILE_EXTS = ('.py', '.pyw')
+    _IGNORE_DIRS = frozenset(map(os.path.realpath, [
+                                                    '.ipynb_checkpoints',
+                                                    '.git',
+                                                    '.svn',
+                                                    '.tox',
+                                                    'test',
+                                                    'tests',
+                                                    '__pycache__',
+                                                   ]))
+    _POOL_MIN_FILES = 50  # Minimum number of files before a process pool is used.
+    _RE_NORM = re.compile(r'[-_.]+')
 
     def __init__(self):
         """Requirements class initialiser."""
@@ -262,23 +280,24 @@ class Requirements:
         """Remove any local packages and builtins from the imports.
 
         Returns:
-            bool: True if all local packages and builtins have been
-            removed, otherwise False with the associated exit code being
-            set.
+            bool: Always returns True.
 
         """
-        _locals = self._define_locals(files=self._files)
-        _builtins = sys.stdlib_module_names
-        self._imps = self._imps - _builtins - (self._imps & _locals)
-        # Verify all locals and builtins have been removed.
-        if self._imps & _locals & _builtins:  # pragma: nocover
-            self._excode = ExCode.ERR_CLEAN
-            return False
+        self._imps.difference_update(self._BUILTINS)
+        self._imps.difference_update(self._define_locals(files=self._files))
         return True
 
     def _collect_imports(self) -> bool:
         """For each module found, extract the import statements.
 
+        If more than :attr:`_POOL_MIN_FILES` modules are found, the
+        modules are parsed in parallel using a process pool. Otherwise,
+        the pool's start-up cost outweighs the benefit and the modules
+        are parsed serially. The modules are also parsed serially if a
+        process pool cannot be created on this platform (e.g. without a
+        working ``sem_open``), or if the pool breaks. An error raised
+        while parsing a module is not caught, as with a serial parse.
+
         Returns:
             bool: True the :attr:`_imps` (imports) attribute is
             populated at the end, otherwise False with the associated
@@ -286,14 +305,27 @@ class Requirements:
 
         """
         logging.debug('Starting import statement extraction on %d files ...', len(self._files))
-        for f in self._files:
-            logging.debug('Reading file: %s', os.path.basename(f))
-            imports = CodeParser.extract_imports(path=f)
-            logging.debug('- Found imports: %s', imports if imports else None)
-            if imports:
-                self._imps = self._imps.union(imports)
-        # Set an import as 'spam' rather than 'spam.eggs'
-        self._imps = set(i.partition('.')[0] for i in self._imps)
+        files = list(self._files)
+        ex = None
+        results = None
+        if len(files) > self._POOL_MIN_FILES:
+            try:
+                ex = ProcessPoolExecutor()
+            except (ImportError, NotImplementedError, OSError) as err:
+                logging.debug('A process pool cannot be created (%s); parsing serially.', err)
+        if ex is not None:
+            with ex:
+                try:
+                    results = list(ex.map(CodeParser.extract_imports, files, chunksize=16))
+                except BrokenProcessPool as err:
+                    logging.debug('The process pool failed (%s); parsing serially.', err)
+        if results is None:
+            results = map(CodeParser.extract_imports, files)
+        for f, imports in zip(files, results):
+            if self._args.debug:
+                logging.debug('Reading file: %s', os.path.basename(f))
+                logging.debug('- Found imports: %s', imports if imports else None)
+            self._imps.update(imports)
         if not self._imps:
             self._excode = ExCode.ERR_IMPTS
             return False
@@ -311,11 +343,13 @@ class Requirements:
             the requirements file itself.
 
         """
-        shash = hashlib.md5(content.encode()).hexdigest()
+        shash = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        fhash = hashlib.blake2b(digest_size=16)
+        # Stream the file in chunks, rather than holding a second copy in memory.
         with open(self._ofile, 'r', encoding='utf-8') as f:  # Cannot be 'rb' for Windows.
-            text = f.read()
-        fhash = hashlib.md5(text.encode()).hexdigest()
-        return shash == fhash
+            for chunk in iter(lambda: f.read(65536), ''):
+                fhash.update(chunk.encode())
+        return shash == fhash.digest()
 
     @staticmethod
     def _define_locals(files: list) -> set:
@@ -335,11 +369,15 @@ class Requirements:
 
         """
         parts = set()
-        # Parse the file paths into their parts.
-        parts.update(*map(lambda x: tuple(os.path.normpath(x).split(os.sep)), files))
-        # Add parts (also) without file extensions.
-        parts.update(map(lambda x: os.path.splitext(x)[0], parts.copy()))
-        parts = parts - {'', '.', '..'}
+        stems = set()
+        for f in files:
+            # Parse the file path into its parts.
+            comps = os.path.normpath(f).split(os.sep)
+            parts.update(comps)
+            # Add the filename (also) without its file extension.
+            stems.add(os.path.splitext(comps[-1])[0])
+        parts |= stems
+        parts -= {'', '.', '..'}
         return parts
 
     def _file_not_exists(self) -> bool:
@@ -375,7 +413,13 @@ class Requirements:
         any of the :attr:`_IGNORE_DIRS` directories.
 
         Note:
-            Hidden files are only detected for Python versions 3.11+.
+            The directory tree is walked once (see :meth:`_walk`), and
+            any ignored directory is pruned from the walk rather than
+            filtered afterwards.
+
+        Note:
+            Symlinked directories are not followed and unreadable
+            directories are skipped, without warning.
 
         Returns:
             bool: True if the list of files is populated, otherwise
@@ -383,21 +427,11 @@ class Requirements:
 
         """
         logging.debug('Starting module file collection ...')
-        files = set()
-        tmp = []
-        for ext in self._FILE_EXTS:
-            vmaj, vmin = sys.version_info[:2]
-            # Hidden files are only available for Python 3.11+ due to glob limitations.
-            if all((vmaj >= 3, vmin >= 11)):
-                tmp.extend(glob(os.path.join(self._args.PATH, '**', ext),
-                                recursive=True,
-                                include_hidden=True))
-            else:  # pragma: nocover
-                tmp.extend(glob(os.path.join(self._args.PATH, '**', ext), recursive=True))
-        # Only keep files which are not in an ignored directory.
-        for file_ in tmp:
-            if all((dir_ not in file_ for dir_ in self._IGNORE_DIRS)):
-                files.add(file_)
+        # Basenames are tested first to avoid a realpath call per directory.
+        ignore_basenames = {os.path.basename(d) for d in self._IGNORE_DIRS}
+        files = set(self._walk(path=self._args.PATH,
+                               ignore=self._IGNORE_DIRS,
+                               ignore_basenames=ignore_basenames))
         if self._args.debug:
             logging.debug('Module files found: %s',
                           ''.join(map('\n\t - {}'.format, files)))
@@ -407,25 +441,109 @@ class Requirements:
             return False
         return True
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_installed_distributions(cls) -> dict:
+        """Build a lookup of all installed distributions.
+
+        All installed distributions are collected in a single sweep of
+        ``importlib.metadata.distributions``, rather than searching the
+        path for each package individually.
+
+        Note:
+            The lookup is cached for the life of the process, so any
+            subsequent call is a dictionary lookup. If the environment
+            changes, the cache can be reset using
+            ``_get_installed_distributions.cache_clear()``.
+
+        Returns:
+            dict: A dictionary of normalised distribution names mapped to
+            their installed version. Where a distribution is found more
+            than once on the path, the first is kept, as with
+            ``importlib.metadata.version``.
+
+        """
+        installed = {}
+        for dist in metadata.distributions():
+            name = dist.metadata['Name']
+            if name:
+                installed.setdefault(cls._normalise_name(name), dist.version)
+        return installed
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_installed_packages(cls) -> dict:
+        """Build a lookup of import names to their distribution(s).
+
+        Note:
+            As with :meth:`_get_installed_distributions`, the lookup is
+            cached for the life of the process.
+
+        Returns:
+            dict: The dictionary returned from
+            ``importlib.metadata.packages_distributions``.
+
+        """
+        return metadata.packages_distributions()
+
     def _get_installed_version(self) -> bool:
         """Get the installed version for each package import.
 
+        Each import name is first resolved to the distribution providing
+        it (e.g. ``yaml`` to ``PyYAML``), using
+        ``importlib.metadata.packages_distributions``, as it is the
+        distribution name which belongs in a requirements file. If an
+        import name is not provided by exactly one distribution, the
+        import name itself is looked up.
+
+        Note:
+            As only the top-level import name is captured, a namespace
+            package (e.g. ``google``, provided by ``protobuf``,
+            ``google-auth``, etc.) cannot be resolved to the
+            distribution(s) actually used, and a warning is logged.
+            Otherwise, every distribution sharing the namespace would be
+            written to the requirements file.
+
         If a package is not installed or the version cannot be looked up,
-        the ``importlib.metadata.PackageNotFoundError`` exception is
-        handled and 'Unknown or not installed' is reported. However, this
-        string is removed from the actual requirements file.
+        'Unknown or not installed' is reported. However, this string is
+        removed from the actual requirements file.
 
         Returns:
             bool: Always returns True.
 
         """
+        installed = self._get_installed_distributions()
+        pkg2dist = self._get_installed_packages()
         for pkg in self._imps:
-            try:
-                self._reqs.add((pkg, metadata.version(pkg)))
-            except metadata.PackageNotFoundError:
-                self._reqs.add((pkg, 'Unknown or not installed'))
+            # A distribution can be listed more than once for the same import name.
+            dists = tuple(dict.fromkeys(pkg2dist.get(pkg, ())))
+            if len(dists) == 1:
+                dist = dists[0]
+            else:
+                if dists:
+                    print()
+                    logging.warning('The %s import is provided by multiple distributions: %s\n'
+                                    'Add the distribution(s) used to the requirements file.\n',
+                                    pkg, ', '.join(dists))
+                dist = pkg
+            version = installed.get(self._normalise_name(dist), 'Unknown or not installed')
+            self._reqs.add((dist, version))
         return True
 
+    @classmethod
+    def _normalise_name(cls, name: str) -> str:
+        """Normalise a distribution name, per PEP 503.
+
+        Args:
+            name (str): Distribution (or import) name to be normalised.
+
+        Returns:
+            str: The lower-case name, with any runs of ``-``, ``_`` and
+            ``.`` characters replaced by a single ``-``.
+
+        """
+        return cls._RE_NORM.sub('-', name).lower()
+
     def _setup_logger(self):
         """Setup: Set the project logger."""
         level = logging.DEBUG if self._args.debug else logging.INFO
@@ -446,7 +564,7 @@ class Requirements:
         ap.parse()
         ap.args.PATH = os.path.realpath(ap.args.PATH)
         if ap.args.ignore_dirs:  # pragma: nocover (Cannot test; this is called on instantiation)
-            self._IGNORE_DIRS += list(map(os.path.realpath, ap.args.ignore_dirs))
+            self._IGNORE_DIRS |= frozenset(map(os.path.realpath, ap.args.ignore_dirs))
         self._args = ap.args
 
     def _shutdown_msgs(self):
@@ -472,9 +590,42 @@ class Requirements:
         logging.debug('Starting up ...')
         if self._args.debug:
             logging.debug('Ignoring the following directories: %s',
-                          ''.join(map('\n\t - {}'.format, self._IGNORE_DIRS)))
+                          ''.join(map('\n\t - {}'.format, sorted(self._IGNORE_DIRS))))
+
+    @classmethod
+    def _walk(cls, path: str, ignore: frozenset, ignore_basenames: set):
+        """Recursively yield the module files under the given path.
+
+        This is a lightweight ``os.walk``, using ``os.scandir`` directly.
+        As with ``os.walk``, symlinked directories are not followed and
+        directories which cannot be read are skipped.
 
-    def _write(self) -> bool:
+        Args:
+            path (str): Path to the directory to be walked.
+            ignore (frozenset): Set of explicit paths to directories
+                which are not to be walked.
+            ignore_basenames (set): Set of the basenames of the
+                ``ignore`` directories, used as a fast first-pass test.
+
+        Yields:
+            str: The path to each file with one of the
+            :attr:`_FILE_EXTS` extensions.
+
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                if e.name in ignore_basenames and os.path.realpath(e.path) in ignore:
+                    continue
+                yield from cls._walk(path=e.path, ignore=ignore, ignore_basenames=ignore_basenames)
+            elif e.name.endswith(cls._FILE_EXTS):
+                yield e.path
+
+    def _write(self, printer=print) -> bool:
         """Write (or display) the requirements file.
 
         If the ``--print`` argument was passed, the requirements are
@@ -482,6 +633,11 @@ class Requirements:
         written to the ``requirements.txt`` file at the ``PATH``
         provided.
 
+        Args:
+            printer (callable, optional): Callable which is passed the
+                text to be displayed when the ``--print`` argument is
+                True. Defaults to ``print``.
+
         .. warning::
 
             This method will **replace** the existing ``requirements.txt``
@@ -492,24 +648,22 @@ class Requirements:
 
         Returns:
             bool: True if either the ``--print`` argument is True or
-            if the file is written as expected (based on an MD5 hash
+            if the file is written as expected (based on a BLAKE2b hash
             checksum). Otherwise False, with the associated exit code
             being set.
 
         """
         _reqs = sorted(self._reqs)
         if self._args.print:
-            print('\nThe following requirements were captured:',
-                  '-'*42,
-                  *_reqs,
-                  '',
-                  sep='\n')
+            printer('\n'.join(('\nThe following requirements were captured:',
+                                '-'*42,
+                                *map(str, _reqs),
+                                '')))
         else:
             genby = f'# Generated by: preqs v{__version__} ({dt.now().astimezone().isoformat()})'
-            content = ('\n'.join(f'{pkg}=={ver}'
-                                 for pkg, ver in _reqs
-                                 if 'Unknown' not in ver)
-                       + f'\n\n{genby}\n')
+            # A list (rather than a generator) avoids str.join building one internally.
+            lines = [f'{pkg}=={ver}' for pkg, ver in _reqs if 'Unknown' not in ver]
+            content = '\n'.join(lines) + f'\n\n{genby}\n'
             with open(self._ofile, 'w', encoding='utf-8') as f:
                 f.write(content)
             if not self._compare(content=content):  # pragma: nocover
@@ -15,6 +15,10 @@
 
         $ ./run.sh
 
+    Run all tests using pytest (in parallel, via pytest-xdist)::
+
+        $ python -m pytest
+
     Run all tests using unittest::
 
         $ python -m unittest discover
@@ -28,7 +32,8 @@
 
 import os
 import sys
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+_DIR_PROJ_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, _DIR_PROJ_ROOT)
 import unittest
 
 
@@ -41,7 +46,7 @@ class TestBase(unittest.TestCase):
     # Allow room for the side comments.
     # pylint: disable=line-too-long
 
-    _DIR_PROJ_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    _DIR_PROJ_ROOT = _DIR_PROJ_ROOT
     _DIR_TEST_ROOT = os.path.join(_DIR_PROJ_ROOT, 'tests')
     _DIR_RESC = os.path.join(_DIR_TEST_ROOT, 'resources')   # Path to the test resources directory.
     _DIR_VER_DATA = os.path.join(_DIR_RESC, 'data')         # Path to the verification data directory.
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:Purpose:   This module provides the pytest configuration for the test
+            suite.
+
+:Platform:  Linux/Windows | Python 3.6+
+:Developer: J Berendt
+:Email:     development@s3dev.uk
+
+:Comments:  The test suite can also be run using unittest, in which case
+            this module is not used.
+
+:Example:
+    Suppress the start of test messages (e.g. for CI runs)::
+
+        $ PREQS_QUIET_TESTS=1 python -m pytest
+
+"""
+# pylint: disable=import-error
+# pylint: disable=wrong-import-position
+
+import os
+import sys
+# Add the tests directory to the path once, so the test modules can use
+# flat imports under both pytest and unittest.
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+import pytest
+from testlibs import msgs
+
+if os.environ.get('PREQS_QUIET_TESTS'):
+    msgs.startoftest.message = lambda module_name: None
+
+
+# Test groups which are run in a forked subprocess, where available, as
+# {test class name: test method name prefix}.
+FORKED_TESTS = {'TestPreqs': 'test01'}
+# Collection results for FORKED_TESTS, as recorded before any deselection.
+COLLECTED_KEY = pytest.StashKey()
+
+
+def is_forked_test(item) -> bool:
+    """Test if the collected item belongs to one of the :data:`FORKED_TESTS`.
+
+    Args:
+        item (pytest.Item): The collected test item.
+
+    Returns:
+        bool: True if the item's class is in :data:`FORKED_TESTS` and its
+        name starts with the associated prefix, otherwise False.
+
+    """
+    cls = getattr(item, 'cls', None)
+    prefix = FORKED_TESTS.get(cls.__name__) if cls else None
+    return prefix is not None and item.name.startswith(prefix)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Run each of the :data:`FORKED_TESTS` in a forked subprocess.
+
+    The ``run`` tests exit through ``sys.exit``. Forking (using
+    pytest-forked) keeps any global state left behind by a run out of
+    the xdist worker, and therefore out of the tests which follow.
+
+    The tests are only marked where pytest-forked is active and the
+    platform supports ``os.fork`` (i.e. not on Windows).
+
+    The classes collected and the matching tests are stored (under
+    :data:`COLLECTED_KEY`) so ``test_conftest`` can verify the
+    selection is not empty; refer to :func:`forked_collection`.
+
+    """
+    classes = {item.cls.__name__ for item in items if getattr(item, 'cls', None)}
+    forked = [item for item in items if is_forked_test(item)]
+    config.stash[COLLECTED_KEY] = (classes & FORKED_TESTS.keys(), forked)
+    if not (hasattr(os, 'fork') and config.pluginmanager.hasplugin('pytest_forked')):
+        return
+    for item in forked:
+        item.add_marker(pytest.mark.forked)
+
+
+@pytest.fixture
+def forked_collection(request) -> tuple:
+    """Provide the collection results for the :data:`FORKED_TESTS`.
+
+    This fixture is used by ``test_conftest``, as importing this module
+    there would create a second copy of the module (pytest imports it as
+    ``tests.conftest``).
+
+    Returns:
+        tuple: A tuple containing the :data:`FORKED_TESTS` groups, the
+        set of their test classes which were collected, and the list of
+        collected items matching the groups.
+
+    """
+    return (FORKED_TESTS, *request.config.stash[COLLECTED_KEY])
+
+
+@pytest.fixture(autouse=True, scope='session')
+def preqs_argv():
+    """Provide a clean command line for the test session.
+
+    ``preqs.Requirements`` parses the command line on instantiation.
+    Without this fixture, the arguments passed to pytest (or to an xdist
+    worker) would be parsed as arguments to ``preqs``.
+
+    The fixture is session-scoped so the command line is also clean when
+    a test class creates instances in ``setUpClass``.
+
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sys, 'argv', ['preqs'])
+        yield
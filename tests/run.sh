@@ -2,6 +2,6 @@
 
 # Run tests.
 printf "\nRunning unit tests ..."
-python -m unittest discover
+python -m pytest
 printf "\nTesting complete.\n\n"
 
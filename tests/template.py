@@ -10,13 +10,10 @@
 :Comments:  n/a
 
 """
+# pylint: disable=import-error
 
-try:
-    from .base import TestBase
-    from .testlibs import msgs
-except ImportError:
-    from base import TestBase
-    from testlibs import msgs
+from base import TestBase
+from testlibs import msgs
 # TestBase must be imported before <lib>.
 # locals import here ...
 
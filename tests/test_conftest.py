@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:Purpose:   Testing module for the pytest configuration (``conftest``)
+            module.
+
+:Platform:  Linux/Windows | Python 3.6+
+:Developer: J Berendt
+:Email:     development@s3dev.uk
+
+:Comments:  These tests are only collected under pytest, as they use
+            pytest's ``request`` fixture.
+
+"""
+# pylint: disable=redefined-outer-name
+
+import importlib.util
+import os
+import pytest
+
+
+def test01a__collection__forked_marker(request, forked_collection):
+    """Test the ``pytest_collection_modifyitems`` hook.
+
+    :Test:
+        - Verify at least one test matches the ``FORKED_TESTS`` groups
+          where the associated test class is collected. Otherwise, a
+          renamed test group would silently stop being forked.
+        - Verify each matching test is marked to run in a forked
+          subprocess, where pytest-forked is installed (and not
+          disabled) and ``os.fork`` is available.
+
+    """
+    pm = request.config.pluginmanager
+    if not hasattr(os, 'fork'):
+        pytest.skip('os.fork is not available on this platform.')
+    if importlib.util.find_spec('pytest_forked') is None or pm.is_blocked('pytest_forked'):
+        pytest.skip('pytest-forked is not installed, or is disabled.')
+    groups, classes, items = forked_collection
+    if not classes:
+        pytest.skip('None of the forked test classes were collected in this session.')
+    assert items, f'No tests match the FORKED_TESTS groups: {groups}'
+    unmarked = [i.nodeid for i in items if i.get_closest_marker('forked') is None]
+    assert not unmarked, f'Tests not marked to run forked: {unmarked}'
@@ -11,19 +11,20 @@
 
 """
 # pylint: disable=arguments-differ
+# pylint: disable=import-error
 # pylint: disable=protected-access
 # pylint: disable=wrong-import-order
 
 import contextlib
+import copy
 import hashlib
 import io
 import os
-try:  # pragma: nocover
-    from .base import TestBase
-    from .testlibs import msgs
-except ImportError:
-    from base import TestBase
-    from testlibs import msgs
+import shutil
+import tempfile
+from unittest import mock
+from base import TestBase
+from testlibs import msgs
 # TestBase must be imported before preqs.
 from preqs import preqs
 
@@ -33,6 +34,34 @@ class TestPreqs(TestBase):
 
     _FN = 'requirements.txt'
     _MSG1 = msgs.templates.not_as_expected.general
+    # Test cases for the ``run`` method:
+    # (pkg, debug, ignore_dirs, exit code, file exists, file hash)
+    _RUN_CASES = (('pkg0', False, (), 30, False, None),                               # No imports
+                  ('pkg1', False, (), 0, True, '634a829dff1b0b207e3b7ac4b6e09b39'),   # No args
+                  ('pkg2', False, (), 10, True, None),                                # File exists
+                  ('pkg3', False, (), 20, False, None),                               # No modules
+                  ('pkg3', True, (), 20, False, None),                                # Debug
+                  ('pkg4', False, ('build', 'docs'), 0, True,
+                   '5deb4497f6595e2ae1f9b48db9e71420'),                               # Ignore dirs
+                 )
+    # Imports collected from the pkg1 resource package.
+    _PKG1_IMPORTS = {'coverage', 'os', 'psutil', 'pylint', 'six', 'subpkg0', 'subpkg1', 'sys',
+                     'tomlkit', 'traceback'}
+    # Test cases for the ``CodeParser.extract_imports`` method:
+    # (description, module source, expected imports)
+    _EXTRACT_CASES = (('Comment', b'# import spam\nimport eggs\n', {'eggs'}),
+                      ('Docstring', b'"""\nimport spam\n"""\nimport eggs\n', {'eggs'}),
+                      ('String', b'x = "import spam"\nimport eggs\n', {'eggs'}),
+                      ('Escaped triple quote',
+                       b'x = """a \\""" b"""\nimport eggs\ndef f():\n    """doc"""\n', {'eggs'}),
+                      ('Semicolon', b'x = 1; import spam\n', {'spam'}),
+                      ('Colon', b'if x: import spam\n', {'spam'}),
+                      ('Alias', b'import spam.ham as ham, eggs as e\n', {'spam', 'eggs'}),
+                      ('From', b'from spam.ham import eggs\n', {'spam'}),
+                      ('Relative', b'from . import spam\nfrom .eggs import ham\n', set()),
+                      ('Continuation', b'import os, \\\n    json\n', {'os', 'json'}),
+                      ('Non-ASCII', 'import n\u00e4me\n'.encode(), {'n\u00e4me'}),
+                     )
 
     @classmethod
     def setUpClass(cls):
@@ -41,20 +70,50 @@ class TestPreqs(TestBase):
         :Tasks:
 
             - Print the start of test message.
+            - Redirect STDERR for all tests in this module.
+            - Build the paths to each test resource package, once.
+            - Create a template ``Requirements`` instance, from which
+              each test's instance is copied.
 
         """
         msgs.startoftest.message(module_name='preqs')
-
-    @classmethod
-    def setUp(cls):
-        """Tasks to perform at the start of each test."""
         cls.redirect_stderr_to_devnull()
+        cls._PATHS = {f'pkg{i}': os.path.join(cls._DIR_RESC, f'pkg{i}') for i in range(5)}
+        cls._template = preqs.Requirements()
 
     @classmethod
-    def tearDown(cls):
-        """Tasks to perform at the end of each test."""
+    def tearDownClass(cls):
+        """Run this method at the end of all tests in this module.
+
+        :Tasks:
+
+            - Restore STDERR.
+
+        """
         cls.restore_stderr()
 
+    def setUp(self):
+        """Run this method at the start of *each* test.
+
+        :Tasks:
+
+            - Create a temporary working directory, in RAM (``/dev/shm``)
+              where available.
+
+        """
+        shm = '/dev/shm'
+        self._workdir = os.path.realpath(tempfile.mkdtemp(dir=shm if os.path.isdir(shm) else None))
+
+    def tearDown(self):
+        """Run this method at the end of *each* test.
+
+        :Tasks:
+
+            - Remove the temporary working directory.
+
+        """
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
     def test00a__argp__invalid_path(self):
         """Test the arg parser with an invalid path.
 
@@ -82,176 +141,424 @@ class TestPreqs(TestBase):
                 with self.subTest('Exit code'):
                     self.assertEqual(100, tst2)
 
-    def test01a__run__no_imports(self):
-        """Test the ``run`` method for a project with no imports.
+    def test01a__run(self):
+        """Test the ``run`` method against each of the :attr:`_RUN_CASES`.
 
         :Test:
+            For each case:
+
             - Verify the exit code is as expected.
-            - Verify the requirements file does not exist.
+            - Verify the requirements file exists (or not) as expected.
+            - Where provided, verify the hash of the requirements file
+              is as expected.
 
         """
-        pkg = 'pkg0'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 30
-            self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
-        with self.subTest('File not exist'):
-            tst = os.path.exists(os.path.join(self._DIR_RESC, pkg, self._FN))
-            exp = False
-            self.assertEqual(tst, exp, msg=self._MSG1.format(exp, tst))
+        for pkg, debug, ignore, exp_code, exp_file, exp_hash in self._RUN_CASES:
+            with self.subTest(pkg=pkg, debug=debug, ignore=ignore):
+                path = self.copy_resource(pkg=pkg)
+                with self.assertRaises(SystemExit) as cm:
+                    r = self.new_requirements()
+                    r._args.PATH = path
+                    r._args.debug = debug
+                    r._IGNORE_DIRS |= {os.path.join(path, d) for d in ignore}
+                    r.run()
+                tst = cm.exception.code
+                self.assertEqual(exp_code, tst, msg=self._MSG1.format(exp_code, tst))
+                tst = os.path.exists(os.path.join(path, self._FN))
+                self.assertEqual(exp_file, tst, msg=self._MSG1.format(exp_file, tst))
+                if exp_hash:
+                    tst = self.calc_file_hash(path=path)
+                    self.assertEqual(exp_hash, tst, msg=self._MSG1.format(exp_hash, tst))
 
-    def test01b__run__no_args(self):
-        """Test the ``run`` method with no arguments.
+    def test03a__write__print(self):
+        """Test the ``_write`` method with the --print flag.
 
         :Test:
-            - Verify the exit code is as expected.
-            - Verify the hash of the requirements file is as expected.
+            - Verify the expected output is included in the print.
 
         """
-        pkg = 'pkg1'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 0
-            self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
-        with self.subTest('File hash'):
-            tst = self.calc_file_hash(pkg=pkg)
-            exp = '50f5706f5ccec946a2c6d1a7e1862c47'
-            self.assertEqual(tst, exp, msg=self._MSG1.format(tst, exp))
-        self.remove_requirements_file(pkg=pkg)
+        reqs = [('thing1', '1.0.0'), ('thing2', '2.0.0'), ('thing3', '3.0.0')]
+        sink = []
+        r = self.new_requirements()
+        r._args.print = True
+        r._reqs = reqs
+        r._write(printer=sink.append)
+        stdout = '\n'.join(sink).split('\n')
+        for idx, req in enumerate(reqs):
+            with self.subTest(f'{idx}: {req}'):
+                self.assertIn(str(req), stdout[idx+3])
 
-    def test01c__run__file_exists(self):
-        """Test the ``run`` method where a requirements file exists.
+    def test04a__find_files__ignore_dirs_partial_name(self):
+        """Test the ``_find_files`` method with a partially matching dir.
 
         :Test:
-            - Verify the exit code is as expected.
+            - Verify an ignored directory whose path is a prefix of
+              another directory (``pro`` vs ``project``) does not cause
+              the other directory's modules to be ignored.
+            - Verify the ignored directories' modules are excluded.
 
         """
-        pkg = 'pkg2'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 10
-            self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+        pkg = 'pkg4'
+        r = self.new_requirements()
+        r._args.PATH = self._PATHS[pkg]
+        r._IGNORE_DIRS = frozenset((os.path.join(self._PATHS[pkg], 'build'),
+                                    os.path.join(self._PATHS[pkg], 'docs'),
+                                    os.path.join(self._PATHS[pkg], 'pro')))
+        r._find_files()
+        tst = r._files
+        exp = {os.path.join(self._PATHS[pkg], 'project', 'mod0.py')}
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test04b__find_files__symlinked_dir(self):
+        """Test the ``_find_files`` method with a symlinked directory.
+
+        :Test:
+            - Verify the modules in a symlinked directory are not
+              collected.
 
-    def test01d__run__no_py_modules(self):
-        """Test the ``run`` method for a project without Python modules.
+        """
+        proj = os.path.join(self._workdir, 'proj')
+        self.make_modules(proj, 'mod0.py')
+        self.make_modules(os.path.join(self._workdir, 'linked'), 'mod1.py')
+        try:
+            os.symlink(os.path.join(self._workdir, 'linked'), os.path.join(proj, 'linked'))
+        except (NotImplementedError, OSError):  # pragma: nocover (Windows without privilege)
+            self.skipTest('Symlinks cannot be created on this platform.')
+        exp = {os.path.join(proj, 'mod0.py')}
+        tst = self.find_files(path=proj)
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test04c__find_files__unreadable_dir(self):
+        """Test the ``_find_files`` method with an unreadable directory.
 
         :Test:
-            - Verify the exit code is as expected.
+            - Verify a directory which cannot be read is skipped, and the
+              modules in the other directories are collected.
 
         """
-        pkg = 'pkg3'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 20
+        proj = os.path.join(self._workdir, 'proj')
+        self.make_modules(proj, 'mod0.py')
+        self.make_modules(os.path.join(proj, 'locked'), 'mod1.py')
+        scandir = os.scandir
+        def _scandir(path):
+            if os.path.basename(path) == 'locked':
+                raise PermissionError(path)
+            return scandir(path)
+        exp = {os.path.join(proj, 'mod0.py')}
+        with mock.patch.object(preqs.os, 'scandir', side_effect=_scandir):
+            tst = self.find_files(path=proj)
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test05a__collect_imports__pool(self):
+        """Test the ``_collect_imports`` method using a process pool.
+
+        :Test:
+            - Verify a process pool is used.
+            - Verify the imports collected are as expected.
+
+        """
+        exp = self._PKG1_IMPORTS
+        with mock.patch.object(preqs, 'ProcessPoolExecutor', wraps=preqs.ProcessPoolExecutor) as m:
+            tst = self.collect_imports(pkg='pkg1', min_files=0)
+        with self.subTest('Pool used'):
+            m.assert_called_once()
+        with self.subTest('Imports'):
             self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
 
-    def test01e__run__ignore_dirs(self):
-        """Test the ``run`` method with the --ignore_dirs flag.
+    def test05b__collect_imports__serial(self):
+        """Test the ``_collect_imports`` method without a process pool.
 
         :Test:
-            - Verify the exit code is as expected.
-            - Verify the hash of the requirements file is as expected.
+            - Verify a process pool is not used.
+            - Verify the imports collected are as expected.
 
         """
-        pkg = 'pkg4'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r._IGNORE_DIRS += [os.path.join(self._DIR_RESC, pkg, 'build'),
-                               os.path.join(self._DIR_RESC, pkg, 'docs')]
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 0
+        exp = self._PKG1_IMPORTS
+        with mock.patch.object(preqs, 'ProcessPoolExecutor') as m:
+            tst = self.collect_imports(pkg='pkg1', min_files=1000)
+        with self.subTest('Pool not used'):
+            m.assert_not_called()
+        with self.subTest('Imports'):
             self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
-        with self.subTest('File hash'):
-            tst = self.calc_file_hash(pkg=pkg)
-            exp = '8f13b4b6c61cdbe2acf7abd80e929335'
-            self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
-        self.remove_requirements_file(pkg=pkg)
 
-    def test02a__debug(self):
-        """Test the ``run`` method with the --debug flag.
+    def test05c__collect_imports__pool_unavailable(self):
+        """Test the ``_collect_imports`` method where a process pool
+        cannot be created.
 
         :Test:
-            - Verify the exit code is as expected.
+            - Verify the modules are parsed serially, and the imports
+              collected are as expected.
 
         """
-        pkg = 'pkg3'
-        with self.assertRaises(SystemExit) as cm:
-            r = preqs.Requirements()
-            r._args.PATH = os.path.join(self._DIR_RESC, pkg)
-            r._args.debug = True
-            r.run()
-        with self.subTest('Exit code'):
-            tst = cm.exception.code
-            exp = 20
-            self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+        exp = self._PKG1_IMPORTS
+        with mock.patch.object(preqs, 'ProcessPoolExecutor', side_effect=NotImplementedError):
+            tst = self.collect_imports(pkg='pkg1', min_files=0)
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
 
-    def test03a__write__print(self):
-        """Test the ``_write`` method with the --print flag.
+    def test05d__collect_imports__pool_broken(self):
+        """Test the ``_collect_imports`` method where the process pool
+        breaks while parsing.
 
         :Test:
-            - Verify the expected output is included in the print.
+            - Verify the modules are parsed serially, and the imports
+              collected are as expected.
 
         """
-        reqs = [('thing1', '1.0.0'), ('thing2', '2.0.0'), ('thing3', '3.0.0')]
-        buf = io.StringIO()
-        with contextlib.redirect_stdout(buf):
-            r = preqs.Requirements()
-            r._args.print = True
-            r._reqs = reqs
-            r._write()
-        stdout = buf.getvalue().split('\n')
-        for idx, req in enumerate(reqs):
-            with self.subTest(f'{idx}: {req}'):
-                self.assertIn(str(req), stdout[idx+3])
+        exp = self._PKG1_IMPORTS
+        pool = mock.MagicMock()
+        pool.__enter__.return_value = pool
+        pool.map.side_effect = preqs.BrokenProcessPool
+        with mock.patch.object(preqs, 'ProcessPoolExecutor', return_value=pool):
+            tst = self.collect_imports(pkg='pkg1', min_files=0)
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test05e__collect_imports__pool_file_error(self):
+        """Test the ``_collect_imports`` method where a module cannot be
+        read by a pool worker.
+
+        :Test:
+            - Verify the worker's ``FileNotFoundError`` is raised to the
+              caller, as with a serial parse.
+            - Verify the error is not logged as a process pool failure.
+
+        """
+        self.make_modules(self._workdir, 'mod0.py')
+        r = self.new_requirements()
+        r._POOL_MIN_FILES = 0
+        r._files = {os.path.join(self._workdir, 'mod0.py'),
+                    os.path.join(self._workdir, 'missing.py')}
+        with self.assertLogs(level='DEBUG') as logs:
+            with self.subTest('Error raised'), self.assertRaises(FileNotFoundError):
+                r._collect_imports()
+        with self.subTest('Not logged as a pool failure'):
+            tst = [msg for msg in logs.output if 'process pool' in msg]
+            self.assertEqual([], tst, msg=self._MSG1.format([], tst))
+
+    def test06a__extract_imports__empty_file(self):
+        """Test the ``CodeParser.extract_imports`` method on an empty file.
+
+        :Test:
+            - Verify an empty file (which cannot be memory-mapped)
+              returns an empty set.
+
+        """
+        path = os.path.join(self._PATHS['pkg3'], 'file1.txt')
+        tst = preqs.CodeParser.extract_imports(path=path)
+        exp = set()
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test06b__extract_imports__cases(self):
+        """Test the ``CodeParser.extract_imports`` method against each of
+        the :attr:`_EXTRACT_CASES`.
+
+        :Test:
+            For each case:
+
+            - Verify the imports extracted from the module are as
+              expected.
+
+        """
+        for desc, code, exp in self._EXTRACT_CASES:
+            with self.subTest(desc):
+                path = os.path.join(self._workdir, 'module.py')
+                with open(path, 'wb') as f:
+                    f.write(code)
+                tst = preqs.CodeParser.extract_imports(path=path)
+                self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test07a__get_installed_version__dist_name(self):
+        """Test the ``_get_installed_version`` method for an import name
+        which differs from its distribution name.
+
+        :Test:
+            - Verify an import provided by a single distribution (listed
+              more than once) is reported under the distribution name,
+              with its installed version.
+
+        """
+        exp = {('PyYAML', '6.0.1')}
+        tst = self.get_installed_version(imps={'yaml'},
+                                         packages={'yaml': ['PyYAML', 'PyYAML']},
+                                         installed={'pyyaml': '6.0.1'})
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test07b__get_installed_version__multiple_dists(self):
+        """Test the ``_get_installed_version`` method for an import name
+        provided by multiple distributions.
+
+        :Test:
+            - Verify a namespace import is reported under its import
+              name, rather than as each distribution sharing the
+              namespace.
+
+        """
+        exp = {('google', 'Unknown or not installed')}
+        tst = self.get_installed_version(imps={'google'},
+                                         packages={'google': ['protobuf', 'google-auth']},
+                                         installed={'protobuf': '4.25.0', 'google-auth': '2.23.0'})
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test07c__get_installed_version__no_dist(self):
+        """Test the ``_get_installed_version`` method for an import name
+        which is not provided by any distribution.
+
+        :Test:
+            - Verify the import name itself is looked up.
+
+        """
+        exp = {('spam', '1.0.0'), ('eggs', 'Unknown or not installed')}
+        tst = self.get_installed_version(imps={'spam', 'eggs'},
+                                         packages={},
+                                         installed={'spam': '1.0.0'})
+        self.assertEqual(exp, tst, msg=self._MSG1.format(exp, tst))
+
+    def test08a__get_installed_distributions__cached(self):
+        """Test the ``_get_installed_distributions`` method's cache.
+
+        :Test:
+            - Verify a second call returns the cached lookup, rather
+              than sweeping the installed distributions again.
+            - Verify the cache is rebuilt after being cleared.
+
+        """
+        preqs.Requirements._get_installed_distributions.cache_clear()
+        tst1 = preqs.Requirements._get_installed_distributions()
+        tst2 = preqs.Requirements._get_installed_distributions()
+        with self.subTest('Cached'):
+            self.assertIs(tst1, tst2)
+        preqs.Requirements._get_installed_distributions.cache_clear()
+        tst3 = preqs.Requirements._get_installed_distributions()
+        with self.subTest('Cleared'):
+            self.assertIsNot(tst1, tst3)
+            self.assertEqual(tst1, tst3, msg=self._MSG1.format(tst1, tst3))
 
 
 #%% Helpers
 
-    def calc_file_hash(self, pkg: str) -> str:
-        """Calculate an MD5 hash against a requirements file.
+    def new_requirements(self) -> preqs.Requirements:
+        """Create a new ``Requirements`` instance for a test.
+
+        Rather than re-parsing the command line (and re-reading the
+        ``NOTICE`` file for the epilog) for each test, the class
+        template instance is deep-copied, so each test has its own
+        arguments namespace and collection attributes.
+
+        Returns:
+            preqs.Requirements: A new ``Requirements`` instance.
+
+        """
+        return copy.deepcopy(self._template)
+
+    def collect_imports(self, pkg: str, min_files: int) -> set:
+        """Collect the imports from a test resource package.
+
+        Args:
+            pkg (str): Name of the package to be analysed.
+            min_files (int): Value for the ``_POOL_MIN_FILES`` attribute,
+                which determines if a process pool is used.
+
+        Returns:
+            set: The imports collected by the ``_collect_imports``
+            method.
+
+        """
+        r = self.new_requirements()
+        r._args.PATH = self._PATHS[pkg]
+        r._POOL_MIN_FILES = min_files
+        r._find_files()
+        r._collect_imports()
+        return r._imps
+
+    def find_files(self, path: str) -> set:
+        """Collect the module files under the given path.
+
+        Args:
+            path (str): Path to the directory to be walked.
+
+        Returns:
+            set: The files collected by the ``_find_files`` method.
+
+        """
+        r = self.new_requirements()
+        r._args.PATH = path
+        r._find_files()
+        return r._files
+
+    @staticmethod
+    def make_modules(path: str, *names: str):
+        """Create a directory containing empty modules.
+
+        Args:
+            path (str): Path to the directory to be created.
+            *names (str): Filename of each module to be created.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in names:
+            with open(os.path.join(path, name), 'w', encoding='utf-8'):
+                pass
+
+    def get_installed_version(self, imps: set, packages: dict, installed: dict) -> set:
+        """Get the requirements for the given imports, using stubbed
+        distribution lookups.
+
+        Args:
+            imps (set): Import names to be looked up.
+            packages (dict): Stub for the ``_get_installed_packages``
+                lookup of import names to distributions.
+            installed (dict): Stub for the
+                ``_get_installed_distributions`` lookup of normalised
+                distribution names to versions.
+
+        Returns:
+            set: The requirements set by the ``_get_installed_version``
+            method.
+
+        """
+        r = self.new_requirements()
+        r._imps = imps
+        with mock.patch.object(preqs.Requirements, '_get_installed_packages',
+                               return_value=packages), \
+             mock.patch.object(preqs.Requirements, '_get_installed_distributions',
+                               return_value=installed):
+            r._get_installed_version()
+        return r._reqs
+
+    def calc_file_hash(self, path: str) -> str:
+        """Calculate a BLAKE2b hash against a requirements file.
 
         As each file has a timestamp at the end, the last line of the
         file is excluded from the hash.
 
         Args:
-            pkg (str): Name of the package used for the test.
+            path (str): Path to the package directory used for the test.
 
         Returns:
-            str: An MD5 hash of the requirements file, except the final
-            line containing the timestamp.
+            str: A (16-byte) BLAKE2b hash of the requirements file,
+            except the final line containing the timestamp.
 
         """
-        with open(os.path.join(self._DIR_RESC, pkg, self._FN), encoding='utf-8') as f:
-            text = f.readlines()
-        return hashlib.md5(''.join(text[:-1]).encode()).hexdigest()
+        with open(os.path.join(path, self._FN), 'rb') as f:
+            # Normalise line endings, as the file is written in text mode on Windows.
+            data = f.read().replace(b'\r\n', b'\n')
+        # Keep the newline preceding the final line.
+        head = data[:data.rindex(b'\n', 0, -1) + 1]
+        return hashlib.blake2b(head, digest_size=16).hexdigest()
 
-    def remove_requirements_file(self, pkg: str):
-        """Remove the requirements file from the given package.
+    def copy_resource(self, pkg: str) -> str:
+        """Copy a test resource package into the temporary directory.
+
+        Tests which write into a package directory use a copy, so the
+        repository's resources are never modified and tests can safely
+        be run in parallel.
 
         Args:
-            pkg (str): Name of the package from which the file is to be
-                removed.
+            pkg (str): Name of the package to be copied.
+
+        Returns:
+            str: Path to the copied package directory.
 
         """
-        path = os.path.join(self._DIR_RESC, pkg, 'requirements.txt')
-        if os.path.exists(path):
-            os.remove(path)
+        return shutil.copytree(self._PATHS[pkg],
+                               os.path.join(tempfile.mkdtemp(dir=self._workdir), pkg),
+                               symlinks=True)